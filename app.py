@@ -1,14 +1,19 @@
 # app.py - Modern Remittance App (Dark Fintech Style)
 
 import streamlit as st
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-import uuid
+from enum import IntEnum
+import secrets
 import random
 import time
+import functools
+
+import orjson
 
 # ── Theme Setup (add to .streamlit/config.toml for persistence, but inline here too)
-st.markdown("""
+_APP_CSS = """
     <style>
     .stApp { background-color: #0e1117; color: #fafafa; }
     .stButton>button { background-color: #2962ff; color: white; border-radius: 8px; padding: 10px 24px; font-weight: bold; }
@@ -18,22 +23,37 @@ st.markdown("""
     .success { color: #10b981; font-size: 1.4em; font-weight: bold; }
     .metric { font-size: 2.2em !important; }
     </style>
-""", unsafe_allow_html=True)
+"""
+
+@st.cache_resource(show_spinner=False)
+def _inject_theme() -> bool:
+    # Runs once per server process; reruns replay the element instead of
+    # rebuilding and resending the CSS block.
+    st.markdown(_APP_CSS, unsafe_allow_html=True)
+    return True
+
+_inject_theme()
 
 # ── Models (your originals, enhanced)
-@dataclass
+@dataclass(slots=True)
 class Currency:
     code: str
     balance: float = 0.0
 
-@dataclass
+@dataclass(slots=True)
 class User:
     id: str
     name: str
     currencies: dict[str, Currency]
     phone: str
+    # Frozen once here so resolve_receiver doesn't build a fresh list on
+    # every keystroke-triggered rerun.
+    _currency_codes: tuple[str, ...] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._currency_codes = tuple(self.currencies)
 
-@dataclass
+@dataclass(slots=True)
 class Quote:
     id: str
     source_currency: str
@@ -41,10 +61,11 @@ class Quote:
     rate: float
     fees: float
     expiry: datetime
+    expiry_ts: float  # monotonic deadline; cheap to compare, immune to clock jumps
     amount_sent: float
     amount_received: float
 
-@dataclass
+@dataclass(slots=True)
 class Transaction:
     id: str
     sender_id: str
@@ -55,56 +76,183 @@ class Transaction:
     currency_received: str
     quote_id: str
     status: str = "Pending"
-    timestamp: datetime = datetime.now()
+    timestamp: datetime = field(default_factory=datetime.now)
 
 # ── In-memory DB (prototype; use SQLite/Supabase for real)
-if "users" not in st.session_state:
-    st.session_state.users = {}
-if "quotes" not in st.session_state:
-    st.session_state.quotes = {}
-if "transactions" not in st.session_state:
-    st.session_state.transactions = []
+# cache_resource gives one process-global store shared by every browser
+# session, so sender/receiver lookups see the same data. Per-session
+# state (current_quote, last_tx) stays in st.session_state.
+@st.cache_resource(show_spinner=False)
+def _db() -> dict:
+    return {"users": {}, "quotes": {}, "transactions": []}
 
+# Shared worker pool for settlement calls, so a slow payment API doesn't
+# hold the script thread hostage for the whole session.
+@st.cache_resource(show_spinner=False)
+def _executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=8)
+
+def _settle(tx: Transaction) -> Transaction:
+    # In prod: call the payment API here, off the script thread.
+    tx.status = "Settled"
+    return tx
+
+@functools.lru_cache(maxsize=1024)
 def calculate_fees(amount: float) -> float:
     return round(amount * 0.012 + 0.50, 2)  # 1.2% + $0.50 (modern low-fee vibe)
 
+# Currency codes as small ints: the selectboxes hand CurrencyCode
+# members straight to create_quote/fetch_rate, so a rate lookup hashes
+# one flat int (src * len + tgt) with no string resolution on the way.
+# .name is used only at the model/display boundary.
+class CurrencyCode(IntEnum):
+    USD = 0
+    EUR = 1
+    NGN = 2
+
+SUPPORTED_CODES = [c.name for c in CurrencyCode]
+
+_BASE_RATES = {
+    CurrencyCode.USD * len(CurrencyCode) + CurrencyCode.EUR: 0.93,
+    CurrencyCode.USD * len(CurrencyCode) + CurrencyCode.NGN: 1620.0,
+    CurrencyCode.EUR * len(CurrencyCode) + CurrencyCode.NGN: 1750.0,
+}
+
+def _fallback_rate(source: str, target: str) -> float:
+    # Seed on (corridor, minute bucket): repeat lookups inside the same
+    # minute return the same rate, keeping the "locked rate" semantic and
+    # avoiding the global random lock. Rates drift once per minute.
+    bucket = int(time.time() // 60)
+    return random.Random(f"{source}:{target}:{bucket}").uniform(0.85, 1.15)
+
+@st.cache_data(ttl=60, max_entries=256, show_spinner=False)
+def fetch_rate(source: CurrencyCode, target: CurrencyCode) -> float:
+    # Simulate real rate fetch (in prod: call API); cached per corridor for 60s
+    time.sleep(1.2)  # simulate API latency — skipped entirely on cache hits
+    rate = _BASE_RATES.get(source * len(CurrencyCode) + target)
+    return rate if rate is not None else _fallback_rate(source.name, target.name)
+
+def tx_to_jsonable(tx: Transaction) -> dict:
+    # orjson serializes dataclasses natively — much faster than
+    # dataclasses.asdict + json, and reusable for API POST bodies later.
+    return orjson.loads(orjson.dumps(tx, option=orjson.OPT_SERIALIZE_DATACLASS | orjson.OPT_NAIVE_UTC))
+
+CURRENCY_SYMBOLS = {"USD": "$", "EUR": "€", "NGN": "₦"}
+
 def format_currency(amount: float, code: str) -> str:
-    symbols = {"USD": "$", "EUR": "€", "NGN": "₦"}
-    return f"{symbols.get(code, code)} {amount:,.2f}"
+    return f"{CURRENCY_SYMBOLS.get(code, code)} {amount:,.2f}"
+
+# Hash settled transactions by id: the default hasher would walk every
+# dataclass field. Safe because a Transaction is never mutated after it
+# is appended, so its id uniquely determines the rendered output.
+@st.cache_data(hash_funcs={Transaction: lambda t: t.id}, max_entries=512, show_spinner=False)
+def _tx_row_html(tx: Transaction) -> str:
+    return f"<div class='card'><strong>{tx.status}</strong> • {tx.timestamp.strftime('%b %d, %H:%M')} • {format_currency(tx.amount_sent, tx.currency_sent)} → {format_currency(tx.amount_received, tx.currency_received)}</div>"
 
 # ── Processor
 class PaymentProcessor:
     def resolve_receiver(self, phone: str):
-        user = st.session_state.users.get(phone)
+        user = _db()["users"].get(phone)
         if not user:
             return None
         return {
             "user": user,
-            "currencies": list(user.currencies.keys()),
+            "currencies": user._currency_codes,
             "min_amount": 5.0,
             "max_amount": 15000.0
         }
 
-    def create_quote(self, source: str, target: str, amount: float) -> Quote:
-        # Simulate real rate fetch (in prod: call API)
-        base_rates = {("USD", "EUR"): 0.93, ("USD", "NGN"): 1620.0, ("EUR", "NGN"): 1750.0}
-        rate = base_rates.get((source, target), random.uniform(0.85, 1.15))
+    def create_quote(self, source: CurrencyCode, target: CurrencyCode, amount: float) -> Quote:
+        rate = fetch_rate(source, target)
         fees = calculate_fees(amount)
         received = round(amount * rate - fees, 2)
 
         quote = Quote(
-            id=str(uuid.uuid4()),
-            source_currency=source,
-            target_currency=target,
+            id=secrets.token_hex(8),
+            source_currency=source.name,
+            target_currency=target.name,
             rate=rate,
             fees=fees,
             expiry=datetime.now() + timedelta(minutes=10),
+            expiry_ts=time.monotonic() + 600.0,
             amount_sent=amount,
             amount_received=received
         )
-        st.session_state.quotes[quote.id] = quote
+        _db()["quotes"][quote.id] = quote
         return quote
 
+# Static card body, built once per quote id — only the countdown caption
+# changes per fragment tick, so this stays a single cached markdown delta.
+@st.cache_data(hash_funcs={Quote: lambda q: q.id}, max_entries=64, show_spinner=False)
+def _quote_card_html(quote: Quote) -> str:
+    return (
+        "<div class='card quote-card'>"
+        "<h3>Your Locked Quote</h3>"
+        "<div style='display:flex; gap:48px;'>"
+        f"<div>Rate<div class='metric'>1 {quote.source_currency} = {quote.rate:,.4f} {quote.target_currency}</div></div>"
+        f"<div>Fees<div class='metric'>{format_currency(quote.fees, quote.source_currency)}</div></div>"
+        "</div><hr>"
+        f"<div>You Send<div class='metric'>{format_currency(quote.amount_sent, quote.source_currency)}</div></div>"
+        f"<div>They Get (after fees)<div class='metric'>{format_currency(quote.amount_received, quote.target_currency)}</div></div>"
+        "</div>"
+    )
+
+# ── Quote card fragment: reruns alone every second for the countdown,
+# so the rest of the page (sidebar balances, rate widgets) stays untouched.
+@st.fragment(run_every="1s")
+def render_quote_card(receiver_phone: str):
+    if "current_quote" not in st.session_state:
+        return
+    quote = st.session_state.current_quote
+    phone = st.session_state.phone
+
+    # Expiry countdown — monotonic float math, no datetime allocations per tick
+    remaining = max(0.0, quote.expiry_ts - time.monotonic())
+    if remaining <= 0:
+        # Hand the outcome back to the full script: a fragment-only rerun
+        # can't refresh anything rendered outside this fragment, and the
+        # next 1s tick would wipe whatever we drew here.
+        st.session_state.quote_expired = True
+        del st.session_state.current_quote
+        st.rerun()
+
+    mins, secs = divmod(int(remaining), 60)
+    st.caption(f"Quote expires in {mins}m {secs}s")
+
+    st.markdown(_quote_card_html(quote), unsafe_allow_html=True)
+
+    if st.button("🚀 Confirm & Transfer", type="primary", use_container_width=True):
+        with st.spinner("Processing secure transfer..."):
+            sender = _db()["users"][phone]
+            tx = Transaction(
+                id=secrets.token_hex(8),
+                sender_id=sender.id,
+                receiver_id=receiver_phone,
+                amount_sent=quote.amount_sent,
+                currency_sent=quote.source_currency,
+                amount_received=quote.amount_received,
+                currency_received=quote.target_currency,
+                quote_id=quote.id
+            )
+            # Settle on the worker pool; poll in short slices so the
+            # session stays responsive instead of one long blocking sleep.
+            fut = _executor().submit(_settle, tx)
+            while not fut.done():
+                time.sleep(0.05)
+            tx = fut.result()
+            _db()["transactions"].append(tx)
+
+            # Fake balance update
+            sender_bal = sender.currencies[quote.source_currency]
+            sender_bal.balance -= (quote.amount_sent + quote.fees)
+
+            # Clear the quote and rerun the whole script so the sidebar
+            # balance, Recent Activity and the success details (rendered
+            # outside this fragment) all reflect the settled transfer.
+            st.session_state.last_tx = tx
+            del st.session_state.current_quote
+            st.rerun()
+
 # ── UI
 st.title("✨ Denzel's Remit – Fast & Secure Transfers")
 st.caption("International money transfers with locked rates & low fees • Port Harcourt powered 💪")
@@ -114,10 +262,12 @@ with st.sidebar:
     st.header("Your Wallet")
     phone = st.text_input("Phone Number", value="+234", key="phone")
     
-    if phone and phone not in st.session_state.users:
+    users = _db()["users"]
+    user = users.get(phone) if phone else None
+    if phone and user is None:
         # Demo user creation
         user = User(
-            id=str(uuid.uuid4()),
+            id=secrets.token_hex(8),
             name="Denzel",
             phone=phone,
             currencies={
@@ -126,10 +276,9 @@ with st.sidebar:
                 "NGN": Currency("NGN", 4500000.00)
             }
         )
-        st.session_state.users[phone] = user
-    
-    if phone in st.session_state.users:
-        user = st.session_state.users[phone]
+        users[phone] = user
+
+    if user:
         for curr in user.currencies.values():
             st.metric(f"{curr.code} Balance", format_currency(curr.balance, curr.code))
 
@@ -140,78 +289,40 @@ if receiver_phone:
     processor = PaymentProcessor()
     receiver_info = processor.resolve_receiver(receiver_phone)
 
-    supported = ["USD", "EUR", "NGN"]
+    supported = SUPPORTED_CODES
     receiver_name = "Unknown (will create on send)" if not receiver_info else receiver_info["user"].name
 
     st.info(f"Recipient: **{receiver_name}** • Supported currencies: {', '.join(supported)}")
 
     col1, col2, col3 = st.columns([2, 2, 1])
-    source_curr = col1.selectbox("You Send", ["USD", "EUR", "NGN"], index=0)
-    target_curr = col2.selectbox("They Receive", supported, index=supported.index("NGN") if "NGN" in supported else 0)
+    codes = list(CurrencyCode)
+    source_curr = col1.selectbox("You Send", codes, index=0, format_func=lambda c: c.name)
+    target_curr = col2.selectbox("They Receive", codes, index=codes.index(CurrencyCode.NGN), format_func=lambda c: c.name)
     amount = col3.number_input("Amount", min_value=5.0, max_value=15000.0, step=10.0, format="%.2f")
 
     if st.button("🔒 Get Locked Quote", type="primary", use_container_width=True) and amount > 0:
         with st.spinner("Fetching best rate..."):
-            time.sleep(1.2)  # simulate API call
             quote = processor.create_quote(source_curr, target_curr, amount)
             st.session_state.current_quote = quote
-            st.session_state.quote_time = time.time()
+
+    if st.session_state.pop("quote_expired", False):
+        st.warning("Quote expired. Get a new one.")
 
     if "current_quote" in st.session_state:
-        quote = st.session_state.current_quote
+        render_quote_card(receiver_phone)
 
-        # Expiry countdown
-        elapsed = time.time() - st.session_state.quote_time
-        remaining = max(0, (quote.expiry - datetime.now()).total_seconds())
-        if remaining <= 0:
-            st.warning("Quote expired. Get a new one.")
-            del st.session_state.current_quote
-        else:
-            mins, secs = divmod(int(remaining), 60)
-            st.caption(f"Quote expires in {mins}m {secs}s")
-
-            with st.container():
-                st.markdown('<div class="card quote-card">', unsafe_allow_html=True)
-                st.subheader("Your Locked Quote")
-                col_a, col_b = st.columns(2)
-                col_a.metric("Rate", f"1 {quote.source_currency} = {quote.rate:,.4f} {quote.target_currency}")
-                col_b.metric("Fees", format_currency(quote.fees, quote.source_currency), delta="-low fees")
-                
-                st.divider()
-                st.metric("You Send", format_currency(quote.amount_sent, quote.source_currency), label_visibility="visible")
-                st.metric("They Get (after fees)", format_currency(quote.amount_received, quote.target_currency), 
-                          delta_color="normal", label_visibility="visible")
-                st.markdown('</div>', unsafe_allow_html=True)
-
-            if st.button("🚀 Confirm & Transfer", type="primary", use_container_width=True):
-                with st.spinner("Processing secure transfer..."):
-                    time.sleep(2.5)  # simulate processing
-                    tx = Transaction(
-                        id=str(uuid.uuid4()),
-                        sender_id=st.session_state.users[phone].id,
-                        receiver_id=receiver_phone,
-                        amount_sent=quote.amount_sent,
-                        currency_sent=quote.source_currency,
-                        amount_received=quote.amount_received,
-                        currency_received=quote.target_currency,
-                        quote_id=quote.id,
-                        status="Settled"
-                    )
-                    st.session_state.transactions.append(tx)
-                    
-                    # Fake balance update
-                    sender_bal = st.session_state.users[phone].currencies[quote.source_currency]
-                    sender_bal.balance -= (quote.amount_sent + quote.fees)
-                    
-                    st.balloons()  # fun success
-                    st.success(f"**Transfer Complete!** 🎉 ID: {tx.id[:8]}")
-                    st.markdown(f"<p class='success'>Sent {format_currency(quote.amount_sent, quote.source_currency)} → Received {format_currency(quote.amount_received, quote.target_currency)}</p>", unsafe_allow_html=True)
-                    
-                    # Clear quote
-                    del st.session_state.current_quote
+    # Success details live outside the fragment so they survive its 1s
+    # ticks; shown on the full rerun triggered right after settlement.
+    if "last_tx" in st.session_state:
+        tx = st.session_state.pop("last_tx")
+        st.balloons()  # fun success
+        st.success(f"**Transfer Complete!** 🎉 ID: {tx.id[:8]}")
+        st.markdown(f"<p class='success'>Sent {format_currency(tx.amount_sent, tx.currency_sent)} → Received {format_currency(tx.amount_received, tx.currency_received)}</p>", unsafe_allow_html=True)
+        st.json(tx_to_jsonable(tx), expanded=False)  # show details
 
 # Recent Transactions
-if st.session_state.transactions:
+if _db()["transactions"]:
     st.subheader("Recent Activity")
-    for tx in reversed(st.session_state.transactions[-5:]):
-        st.markdown(f"<div class='card'><strong>{tx.status}</strong> • {tx.timestamp.strftime('%b %d, %H:%M')} • {format_currency(tx.amount_sent, tx.currency_sent)} → {format_currency(tx.amount_received, tx.currency_received)}</div>", unsafe_allow_html=True)
+    # One concatenated block → a single markdown element instead of one per row
+    rows_html = "".join(_tx_row_html(tx) for tx in reversed(_db()["transactions"][-5:]))
+    st.markdown(rows_html, unsafe_allow_html=True)